@@ -1,111 +1,388 @@
 """Board games."""
 """Board games."""
+import locale
+import os
+import pickle
+import tempfile
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SNAPSHOT_VERSION = 5
+
+
+@lru_cache(maxsize=4096)
+def parse_path(path: str):
+    """
+    Parse a statistics path into a query tuple.
+
+    "/players" -> ("players",), "/games" -> ("games",),
+    "/total" -> ("total", None), "/total/points" -> ("total", "points"),
+    "/game/chess/amount" -> ("game", "chess", "amount"), "/player/joosep/won" -> ("player", "joosep", "won").
+    Return None for an unknown path. Parsed paths are remembered, so every path is parsed only once.
+    """
+    parts = path.strip("/").split("/")
+    if parts in (["players"], ["games"]):
+        return (parts[0],)
+    if parts[0] == "total" and len(parts) <= 2:
+        return "total", parts[1] if len(parts) == 2 else None
+    if parts[0] in ("game", "player") and len(parts) == 3:
+        return tuple(parts)
+    return None
 
 
 class Statistics:
     """Collect data and create statistics."""
 
-    def __init__(self, filename: str):
-        """Stat constructor."""
+    def __init__(self, filename, cache_size: int = 1024, workers: int = None, snapshot: str = None):
+        """
+        Stat constructor.
+
+        filename is a results file, a list of files or a directory of files. Many files are
+        imported in parallel by up to workers processes (see import_files).
+        Results of get are cached for up to cache_size paths, the cache is emptied when data is added.
+        If snapshot file is given, statistics are loaded from it when it is up to date,
+        otherwise the data is imported and the snapshot is written.
+        """
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.result_table = None
         self.games = []
         self.players = []
+        self.game_index = {}
+        self.player_index = {}
         self.filename = filename
-        self.import_data()
+        self.positions = {}
+        if snapshot and self.load_snapshot(snapshot):
+            return
+        if isinstance(filename, (list, tuple)) or os.path.isdir(filename):
+            self.import_files(self.source_files(), workers)
+        else:
+            self.import_data()
+        if snapshot:
+            self.save_snapshot(snapshot)
+
+    def clear_cache(self):
+        """Forget cached results and the result table, called whenever data changes."""
+        self.cache.clear()
+        self.result_table = None
+
+    def get_result_table(self):
+        """Return a ResultTable of the current data, built once until the data changes."""
+        if self.result_table is None:
+            self.result_table = ResultTable(self)
+        return self.result_table
+
+    def source_files(self) -> list:
+        """Return the list of result files statistics are made of."""
+        if isinstance(self.filename, (list, tuple)):
+            return list(self.filename)
+        if os.path.isdir(self.filename):
+            return sorted(entry.path for entry in os.scandir(self.filename) if entry.is_file())
+        return [self.filename]
+
+    def source_signature(self) -> tuple:
+        """Return (path, size, modification time) of every source file, used to tell if a snapshot is stale."""
+        signature = []
+        for filename in self.source_files():
+            stat = os.stat(filename)
+            signature.append((os.path.abspath(filename), stat.st_size, stat.st_mtime_ns))
+        return tuple(signature)
+
+    def save_snapshot(self, snapshot: str):
+        """
+        Write players, games and the read positions to a binary snapshot file.
+
+        The data is written to a temporary file next to snapshot and moved over it,
+        so other processes never read a half-written snapshot.
+        """
+        data = {
+            "version": SNAPSHOT_VERSION,
+            "source": self.source_signature(),
+            "positions": self.positions,
+            "players": self.players,
+            "games": self.games,
+        }
+        handle, temporary = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(snapshot)), suffix=".tmp")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, snapshot)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def load_snapshot(self, snapshot: str) -> bool:
+        """
+        Load players and games from a snapshot file written by save_snapshot.
+
+        Nothing is loaded if the file is missing, cannot be read, has another SNAPSHOT_VERSION or
+        the source files have changed since it was written.
+        Return whether the snapshot was loaded.
+        """
+        try:
+            with open(snapshot, "rb") as file:
+                data = pickle.load(file)
+            if not isinstance(data, dict) or data.get("version") != SNAPSHOT_VERSION:
+                return False
+            if data["source"] != self.source_signature():
+                return False
+            players, games, positions = list(data["players"]), list(data["games"]), dict(data["positions"])
+            player_index = {player.name: player for player in players}
+            game_index = {game.name: game for game in games}
+        except Exception:
+            return False  # a corrupt snapshot can fail in many ways, the data is imported instead
+        self.clear_cache()
+        self.players, self.games, self.positions = players, games, positions
+        self.player_index, self.game_index = player_index, game_index
+        return True
 
     def import_data(self):
-        """Get data from file."""
-        data_list = []
-        with open(self.filename) as file:
+        """
+        Get data from file.
+
+        The file is read line by line, every line is parsed once and added to
+        player and game statistics right away, so the whole file is never held in memory.
+        The file is taken as finished, so a last line without a newline is added too.
+        """
+        self.positions = {}
+        self.update_file(self.filename, final=True)
+
+    def import_files(self, filenames, workers: int = None):
+        """
+        Import many files.
+
+        Every file is imported into its own Statistics in a process pool and the results are
+        merged in the order of filenames, which gives the same statistics as importing the files
+        one after another.
+        """
+        if workers == 1 or len(filenames) < 2:
+            for filename in filenames:
+                self.merge(Statistics(filename))
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for part in executor.map(Statistics, filenames):
+                self.merge(part)
+
+    def merge(self, other):
+        """Add all players and games and the read positions of other Statistics to this one."""
+        self.clear_cache()
+        self.positions.update(other.positions)
+        for other_player in other.players:
+            player = self.find_player_in_list(other_player.name)
+            if not player:
+                player = self.add_player(Player(other_player.name))
+            player.merge(other_player)
+        for other_game in other.games:
+            game = self.find_game_in_list(other_game.name)
+            if not game:
+                game = self.add_game(Game(other_game.name, other_game.type))
+            game.merge(other_game)
+
+    def add_result(self, line: str):
+        """Add one "name;players;type;results" line to all statistics."""
+        self.add_record(self.parse_line(line))
+
+    def update(self, final: bool = False) -> int:
+        """
+        Add lines appended to the source files since the last import or update.
+
+        Every source file (see source_files) has its own read position in positions, so update works
+        for a list or a directory of files too. Files that appear in the directory later are read
+        from the start. Files are updated in the order of source_files.
+        Return the number of results added.
+        """
+        return sum(self.update_file(filename, final) for filename in self.source_files())
+
+    def update_file(self, filename: str, final: bool = False) -> int:
+        """
+        Add lines appended to filename since it was last read.
+
+        Only complete lines (ending with a newline) are added, an unfinished last line may still
+        be being written and is read next time. If final, the file is taken as finished and
+        a last line without a newline is added too.
+        The position moves past a line before it is added, so a malformed line raises ValueError once
+        and is skipped by the next update.
+        Return the number of results added.
+        """
+        added = 0
+        encoding = locale.getpreferredencoding(False)
+        position = self.positions.get(filename, 0)
+        with open(filename, "rb") as file:
+            file.seek(position)
             for line in file:
-                if "\n" in line:
-                    data_list.append(tuple(line[:-1].split(";")))
-                else:
-                    data_list.append(tuple(line.split(";")))
-        self.add_player_from_data(data_list)
-        self.add_games_from_data(data_list)
+                if not line.endswith(b"\n") and not final:
+                    break
+                position += len(line)
+                self.positions[filename] = position
+                if line.strip():
+                    self.add_result(line.decode(encoding))
+                    added += 1
+        return added
+
+    def follow(self, interval: float = 1.0):
+        """
+        Follow the source files like tail -f.
+
+        Check the files for new lines every interval seconds and add them (see update).
+        Yield the number of results added on every check, stop by stopping the iteration.
+        """
+        while True:
+            yield self.update()
+            time.sleep(interval)
+
+    def parse_line(self, line: str) -> tuple:
+        """Parse line "name;players;type;results" into a record (see make_record)."""
+        return self.make_record(tuple(line.rstrip("\r\n").split(";")))
+
+    def make_record(self, element: tuple) -> tuple:
+        """
+        Turn (name, players, type, results) strings into a record.
+
+        Record is a tuple (game name, list of players, game type, list of results, winner, loser),
+        where winner is a tuple (name, result) and loser is a name or None for "winner" games.
+        Raise ValueError for a malformed element, before any statistics are changed.
+        """
+        if len(element) != 4:
+            raise ValueError(f"Expected 4 fields name;players;type;results, got {len(element)}: {';'.join(element)!r}")
+        players = element[1].split(",")
+        results = element[3].split(",")
+        if element[2] == "points":
+            if len(results) != len(players):
+                raise ValueError(f"{len(players)} players but {len(results)} points: {';'.join(element)!r}")
+            points = [int(point) for point in results]
+            max_points = max(points)
+            winner = (players[points.index(max_points)], max_points)
+            loser = players[points.index(min(points))]
+        elif element[2] == "places":
+            if sorted(results) != sorted(players):
+                raise ValueError(f"Places do not list the players {','.join(players)}: {';'.join(element)!r}")
+            winner = (results[0], 1)
+            loser = results[-1]
+        else:
+            winner = (element[3], 1)
+            loser = None
+        return element[0], players, element[2], results, winner, loser
+
+    def add_record(self, record: tuple):
+        """Add one record to player and game statistics."""
+        self.add_player_record(record)
+        self.add_game_record(record)
 
     def add_games_from_data(self, data_list):
         """Create and add games."""
         for element in data_list:
-            game = self.find_game_in_list(element[0])
-            if not game:
-                game = Game(element[0], element[2])
-                self.games.append(game)
-            players = element[1].split(",")
-            game.add_count(element[1])
-            game.add_winner(self.find_winner(players, element))
-
-            if game.type == "winner":
-                for player in players:
-                    if player == element[3]:
-                        game.add_results((player, 1))
-                    else:
-                        game.add_results((player, 2))
-                        break
-
-            game.losers.append(self.find_loser(players, element))
-            points = element[3].split(",")
-            for i, player in enumerate(players):
-                if game.type == "points":
-                    game.add_results((player, points[i]))
-                elif game.type == "places":
-                    game.add_results((player, i + 1))
+            self.add_game_record(self.make_record(element))
+
+    def add_game_record(self, record: tuple):
+        """Add record to game statistics, create the game if needed."""
+        name, players, game_type, results, winner, loser = record
+        self.clear_cache()
+        game = self.find_game_in_list(name)
+        if not game:
+            game = self.add_game(Game(name, game_type))
+        game.add_count(players)
+        game.add_winner(winner)
+
+        if game.type == "winner":
+            for player in players:
+                if player == results[0]:
+                    game.add_results((player, 1))
+                else:
+                    game.add_results((player, 2))
+                    break
+
+        game.add_loser(loser)
+        if game_type == "places":
+            places = {player: place for place, player in enumerate(results, 1)}
+            for player in players:
+                game.add_place((player, places[player]))
+        elif game_type == "winner":
+            for player in players:
+                game.add_place((player, 1 if player == results[0] else 2))
+        for i, player in enumerate(players):
+            if game.type == "points":
+                game.add_results((player, results[i]))
+            elif game.type == "places":
+                game.add_results((player, i + 1))
 
     def add_player_from_data(self, data_list):
         """Create and add player."""
-        loser_name = ""
         for element in data_list:
-            players = element[1].split(",")
-            winner_name = self.find_winner(players, element)[0]
-            if element[2] == "points" or element[2] == "places":
-                loser_name = self.find_loser(players, element)
-            for player_name in players:
-                player = self.find_player_in_list(player_name)
-                if not player:
-                    player = Player(player_name)
-                    self.players.append(player)
-                if player_name == winner_name:
-                    player.add_win(element[0])
-                if player_name == loser_name:
-                    player.add_loss(element[0])
-                player.add_game_count(element[0])
+            self.add_player_record(self.make_record(element))
+
+    def add_player_record(self, record: tuple):
+        """Add record to player statistics, create players if needed."""
+        name, players, game_type, results, winner, loser = record
+        self.clear_cache()
+        for player_name in players:
+            player = self.find_player_in_list(player_name)
+            if not player:
+                player = self.add_player(Player(player_name))
+            if player_name == winner[0]:
+                player.add_win(name)
+            if player_name == loser:
+                player.add_loss(name)
+            player.add_game_count(name)
 
     def get(self, path: str):
         """Return requested statistics."""
-        if path == "/players":
+        query = parse_path(path)
+        if query in self.cache:
+            self.cache.move_to_end(query)
+            result = self.cache[query]
+        else:
+            result = self.run_query(query)
+            self.cache[query] = result
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return list(result) if isinstance(result, list) else result
+
+    def run_query(self, query):
+        """Return statistics for a query tuple given by parse_path."""
+        if query is None:
+            return None
+        elif query[0] == "players":
             return [player.name for player in self.players]
-
-        elif path == "/games":
+        elif query[0] == "games":
             return [game.name for game in self.games]
-
-        elif "/total" in path:
-            return self.get_stat_total(path)
-
-        elif "/game" in path:
-            return self.get_game_stat(path)
-
-        elif "/player" in path:
-            return self.get_player_stat(path)
+        elif query[0] == "total":
+            return self.total_stat(query[1])
+        elif query[0] == "game":
+            return self.game_stat(query[1], query[2])
+        return self.player_stat(query[1], query[2])
 
     def get_stat_total(self, path):
         """Get /total/... stat."""
-        if "/total/" in path:
-            stat_type = path[7:]
+        return self.total_stat(parse_path(path)[1])
+
+    def total_stat(self, stat_type=None):
+        """Count games played, only games of stat_type if given."""
+        if stat_type is not None:
             return sum([game.counter for game in self.games if game.type == stat_type])
         return sum([game.counter for game in self.games])
 
     def get_player_stat(self, path):
         """Get player statistics."""
-        path = path[8:]
-        player_name = path[:path.index("/")]
+        return self.player_stat(*parse_path(path)[1:])
+
+    def player_stat(self, player_name: str, stat: str):
+        """Get statistic stat ("amount", "favourite" or "won") of a player."""
         player = self.find_player_in_list(player_name)
-        if "/amount" in path:
+        if stat == "amount":
             return sum(player.games.values())
 
-        elif "/favourite" in path:
+        elif stat == "favourite":
             return self.get_player_stat_favorite(player)
 
-        elif "/won" in path:
+        elif stat == "won":
             return sum(player.wins.values())
 
     def get_player_stat_favorite(self, player):
@@ -119,29 +396,30 @@ class Statistics:
 
     def get_game_stat(self, path):
         """Get game stat."""
-        path = path[6:]
-        game_name = path[:path.index("/")]
+        return self.game_stat(*parse_path(path)[1:])
+
+    def game_stat(self, game_name: str, stat: str):
+        """Get statistic stat ("amount", "player-amount", "most-wins" etc.) of a game."""
         game = self.find_game_in_list(game_name)
-        if "/amount" in path:
-            return self.find_game_in_list(game_name).counter
+        if stat == "amount":
+            return game.counter
 
-        elif "/player-amount" in path:
-            return max(game.number_of_players, key=game.number_of_players.count)
+        elif stat == "player-amount":
+            return game.player_amount_tally.most_common
 
-        elif "/most-wins" in path:
-            winners = [winner for winner in game.winners.keys()]
-            return max(winners, key=winners.count)
+        elif stat == "most-wins":
+            return game.first_winner()
 
-        elif "/most-frequent-winner" in path:
+        elif stat == "most-frequent-winner":
             return self.get_most_freq_winner(game_name)
 
-        elif "/most-losses" in path:
-            return min(game.losers, key=game.losers.count)
+        elif stat == "most-losses":
+            return game.loser_tally.least_common
 
-        elif "/most-frequent-loser" in path:
+        elif stat == "most-frequent-loser":
             return self.get_most_freq_loser(game_name)
 
-        elif "/record-holder" in path:
+        elif stat == "record-holder":
             return self.get_game_record_holder(game)
 
     def get_game_record_holder(self, game):
@@ -165,8 +443,9 @@ class Statistics:
         return best_player
 
     def get_most_freq_loser(self, game_name: str):
-        """Find most frequent loser."""
+        """Find most frequent loser, None if nobody has lost the game (e.g. a "winner" game)."""
         game_loss_freq = 0
+        player_name = None
         for player in self.players:
             if game_name in player.losses and game_name in player.games:
                 loss_freq = player.losses[game_name] / player.games[game_name]
@@ -205,19 +484,25 @@ class Statistics:
             places = element[3].split(",")
             return places[-1]
 
+    def add_player(self, player):
+        """Add player to player list and index, return the player."""
+        self.players.append(player)
+        self.player_index[player.name] = player
+        return player
+
+    def add_game(self, game):
+        """Add game to game list and index, return the game."""
+        self.games.append(game)
+        self.game_index[game.name] = game
+        return game
+
     def find_player_in_list(self, player_name):
-        """Find player in player list."""
-        for player in self.players:
-            if player_name == player.name:
-                return player
-        return False
+        """Find player by name, False if there is no such player."""
+        return self.player_index.get(player_name, False)
 
     def find_game_in_list(self, game_name):
-        """Find game in game list."""
-        for game in self.games:
-            if game_name == game.name:
-                return game
-        return False
+        """Find game by name, False if there is no such game."""
+        return self.game_index.get(game_name, False)
 
 
 class Player:
@@ -248,6 +533,15 @@ class Player:
         else:
             self.losses[game] += 1
 
+    def merge(self, other):
+        """Add wins, losses and game counts of other player with the same name."""
+        for game, count in other.wins.items():
+            self.wins[game] = self.wins.get(game, 0) + count
+        for game, count in other.games.items():
+            self.games[game] = self.games.get(game, 0) + count
+        for game, count in other.losses.items():
+            self.losses[game] = self.losses.get(game, 0) + count
+
     def add_game_count(self, game: str):
         """Count games."""
         if game not in self.games:
@@ -264,19 +558,55 @@ class Game:
         self.name = name
         self.type = game_type
         self.results = {}
+        self.places = {}
         self.winners = {}
-        self.losers = []
         self.counter = 0
-        self.number_of_players = []
+        self.player_amount_tally = Tally()
+        self.loser_tally = Tally()
 
     def __repr__(self):
         """Name."""
         return self.name
 
+    @property
+    def losers(self) -> list:
+        """
+        Deprecated, use loser_tally.
+
+        Return a list of all losers, every loser repeated as many times as they lost, in the order
+        they first lost.
+        """
+        warnings.warn("Game.losers is deprecated, use Game.loser_tally", DeprecationWarning, stacklevel=2)
+        return self.loser_tally.values()
+
+    @property
+    def number_of_players(self) -> list:
+        """
+        Deprecated, use player_amount_tally.
+
+        Return a list of the number of players of every play, grouped by value in the order
+        the values were first seen.
+        """
+        warnings.warn("Game.number_of_players is deprecated, use Game.player_amount_tally",
+                      DeprecationWarning, stacklevel=2)
+        return self.player_amount_tally.values()
+
+    def first_winner(self):
+        """
+        Return the player who won the game first.
+
+        This is what max(winners, key=winners.count) gives for the keys of winners, as every key is there once.
+        """
+        return next(iter(self.winners), None)
+
     def add_winner(self, result: tuple):
         """Get tuple with winner and result and add to winners."""
         self.winners[result[0]] = result[1]
 
+    def add_loser(self, loser):
+        """Count loser name (None if the game has no loser) in loser_tally."""
+        self.loser_tally.add(loser)
+
     def add_results(self, result: tuple):
         """Get tuple (player name, result) and add to results dict."""
         if result[0] not in self.results:
@@ -284,11 +614,166 @@ class Game:
         else:
             self.results[result[0]].append(result[1])
 
+    def add_place(self, place: tuple):
+        """
+        Get tuple (player name, finishing place) and add to places dict.
+
+        Places are kept for "places" and "winner" games, in "winner" games the winner is 1 and everybody else 2.
+        """
+        if place[0] not in self.places:
+            self.places[place[0]] = [place[1]]
+        else:
+            self.places[place[0]].append(place[1])
+
+    def merge(self, other):
+        """Add results, places, winners and tallies of other game with the same name."""
+        for player, results in other.results.items():
+            self.results.setdefault(player, []).extend(results)
+        for player, places in other.places.items():
+            self.places.setdefault(player, []).extend(places)
+        self.winners.update(other.winners)
+        self.counter += other.counter
+        self.player_amount_tally.merge(other.player_amount_tally)
+        self.loser_tally.merge(other.loser_tally)
+
     def add_count(self, players):
         """
         Add game count.
 
-        Get string with players and add number of players to list.
+        Get players (string "p1,p2" or list of names) and count the number of players in player_amount_tally.
         """
+        if isinstance(players, str):
+            players = players.split(",")
         self.counter += 1
-        self.number_of_players.append(len(players.split(",")))
\ No newline at end of file
+        self.player_amount_tally.add(len(players))
+
+
+class Tally:
+    """
+    Count how many times each value is added.
+
+    The most common value is kept ready, so reading it does not go over all values. The least common
+    value is found when it is asked for and remembered until it is counted again.
+    Ties go to the value that was added first, like max(values, key=values.count) and
+    min(values, key=values.count) would give.
+    """
+
+    def __init__(self):
+        """Tally constructor."""
+        self.counts = {}
+        self.order = {}
+        self.most_common = None
+        self._least_common = None
+        self._least_known = False
+
+    def add(self, value):
+        """Count value once more."""
+        count = self.counts.get(value, 0) + 1
+        if count == 1:
+            self.order[value] = len(self.order)
+        self.counts[value] = count
+
+        best = self.most_common
+        if len(self.order) == 1 or count > self.counts[best] or (count == self.counts[best] and self.order[value] < self.order[best]):
+            self.most_common = value
+        if self._least_known:
+            if value == self._least_common:
+                self._least_known = False
+            elif count == 1 and self.counts[self._least_common] > 1:
+                self._least_common = value
+
+    def merge(self, other):
+        """Add all counts of other tally, values first seen in other come after the values of this one."""
+        for value, count in other.counts.items():
+            if value not in self.counts:
+                self.order[value] = len(self.order)
+                self.counts[value] = 0
+            self.counts[value] += count
+        if self.counts:
+            self.most_common = max(self.counts, key=self.counts.get)
+        self._least_known = False
+
+    @property
+    def least_common(self):
+        """Return the least common value, None if nothing has been counted."""
+        if not self._least_known:
+            if not self.counts:
+                return None
+            self._least_common = min(self.counts, key=self.counts.get)
+            self._least_known = True
+        return self._least_common
+
+    def values(self) -> list:
+        """Return a list with every value repeated as many times as it was counted, in the order values were first seen."""
+        return [value for value, count in self.counts.items() for _ in range(count)]
+
+
+class ResultTable:
+    """
+    Results of all games in numpy columns.
+
+    Every result in Game.results of a points game and every place in Game.places of other games is a row
+    with player id, game id, score (NaN if the game is not a points game) and finishing place
+    (0 for points games). Wins and plays of every player
+    in every game are kept in (players x games) arrays. Ids are indexes into player_names and game_names.
+    """
+
+    def __init__(self, statistics: Statistics):
+        """Build the columns from statistics, needs numpy."""
+        if np is None:
+            raise ImportError("ResultTable requires numpy")
+        self.player_names = [player.name for player in statistics.players]
+        self.game_names = [game.name for game in statistics.games]
+        player_ids = {name: i for i, name in enumerate(self.player_names)}
+        game_ids = {name: i for i, name in enumerate(self.game_names)}
+
+        players, games, scores, places = [], [], [], []
+        for game_id, game in enumerate(statistics.games):
+            rows = game.results if game.type == "points" else game.places
+            for name, results in rows.items():
+                players.extend([player_ids[name]] * len(results))
+                games.extend([game_id] * len(results))
+                if game.type == "points":
+                    scores.extend(results)
+                    places.extend([0] * len(results))
+                else:
+                    scores.extend([np.nan] * len(results))
+                    places.extend(results)
+        self.player_ids = np.array(players, dtype=np.int32)
+        self.game_ids = np.array(games, dtype=np.int32)
+        self.scores = np.array(scores, dtype=np.float64)
+        self.places = np.array(places, dtype=np.int16)
+
+        self.wins = np.zeros((len(self.player_names), len(self.game_names)), dtype=np.int32)
+        self.plays = np.zeros_like(self.wins)
+        for player_id, player in enumerate(statistics.players):
+            for name, count in player.wins.items():
+                self.wins[player_id, game_ids[name]] = count
+            for name, count in player.games.items():
+                self.plays[player_id, game_ids[name]] = count
+
+    def top_average_points(self, n: int = 10, game: str = None) -> list:
+        """Return up to n (player, average points) tuples with the highest averages, only in game if given."""
+        rows = ~np.isnan(self.scores)
+        if game is not None:
+            rows &= self.game_ids == self.game_names.index(game)
+        counts = np.bincount(self.player_ids[rows], minlength=len(self.player_names))
+        totals = np.bincount(self.player_ids[rows], weights=self.scores[rows], minlength=len(self.player_names))
+        averages = np.divide(totals, counts, out=np.full(len(counts), np.nan), where=counts > 0)
+        played = np.flatnonzero(counts)
+        best = played[np.argsort(-averages[played], kind="stable")[:n]]
+        return [(self.player_names[i], float(averages[i])) for i in best]
+
+    def win_rates(self):
+        """Return (players x games) array of wins / plays, NaN where the player has not played the game."""
+        return np.divide(self.wins, self.plays, out=np.full(self.wins.shape, np.nan), where=self.plays > 0)
+
+    def record_holders(self) -> dict:
+        """Return {game: (player, score)} with the highest score ever in every points game, first one wins ties."""
+        rows = np.flatnonzero(~np.isnan(self.scores))
+        order = rows[np.lexsort((rows, -self.scores[rows], self.game_ids[rows]))]
+        games, first = np.unique(self.game_ids[order], return_index=True)
+        return {
+            self.game_names[game]: (self.player_names[self.player_ids[row]], float(self.scores[row]))
+            for game, row in zip(games, order[first])
+        }
@@ -0,0 +1,100 @@
+"""Synthetic data and benchmark for board game statistics."""
+import os
+import random
+import sys
+import tempfile
+import time
+
+from board_games import Statistics
+
+GAME_TYPES = ("points", "places", "winner")
+GAME_STATS = ("amount", "player-amount", "most-wins", "most-frequent-winner", "most-losses",
+              "most-frequent-loser", "record-holder")
+PLAYER_STATS = ("amount", "favourite", "won")
+LOSER_STATS = ("most-losses", "most-frequent-loser")
+
+
+def generate(filename: str, rows: int, players: int = 50, games: int = 10, seed: int = 0):
+    """
+    Write a results file with rows lines "game;p1,p2;type;results".
+
+    Every game gets one type (points, places or winner in turn), every line has 2 to 5 random players.
+    """
+    rng = random.Random(seed)
+    player_names = [f"player{i}" for i in range(players)]
+    game_list = [(f"game{i}", GAME_TYPES[i % len(GAME_TYPES)]) for i in range(games)]
+    with open(filename, "w") as file:
+        for _ in range(rows):
+            name, game_type = rng.choice(game_list)
+            playing = rng.sample(player_names, rng.randint(2, min(5, players)))
+            if game_type == "points":
+                results = ",".join(str(rng.randint(0, 100)) for _ in playing)
+            elif game_type == "places":
+                results = ",".join(rng.sample(playing, len(playing)))
+            else:
+                results = rng.choice(playing)
+            file.write(f"{name};{','.join(playing)};{game_type};{results}\n")
+
+
+def all_paths(statistics: Statistics) -> list:
+    """Return every path Statistics.get answers for the data in statistics, loser stats only for games with losers."""
+    paths = ["/players", "/games", "/total"] + [f"/total/{game_type}" for game_type in GAME_TYPES]
+    paths += [
+        f"/game/{game.name}/{stat}" for game in statistics.games for stat in GAME_STATS
+        if game.type != "winner" or stat not in LOSER_STATS
+    ]
+    paths += [f"/player/{player}/{stat}" for player in statistics.get("/players") for stat in PLAYER_STATS]
+    return paths
+
+
+def percentile(values: list, percent: float) -> float:
+    """Return the value below which percent % of sorted values are."""
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def time_get(statistics: Statistics, paths: list, cached: bool) -> list:
+    """
+    Return sorted get latencies in seconds.
+
+    If not cached, the result cache is emptied before every call, otherwise every path is asked once before timing.
+    """
+    latencies = []
+    if cached:
+        for path in paths:
+            statistics.get(path)
+    for path in paths:
+        if not cached:
+            statistics.clear_cache()
+        start = time.perf_counter()
+        statistics.get(path)
+        latencies.append(time.perf_counter() - start)
+    return sorted(latencies)
+
+
+def benchmark(filename: str) -> dict:
+    """Time importing filename and every get path, return rows/s and latency percentiles in microseconds."""
+    with open(filename) as file:
+        rows = sum(1 for line in file if line.strip())
+    start = time.perf_counter()
+    statistics = Statistics(filename)
+    seconds = time.perf_counter() - start
+    paths = all_paths(statistics)
+    report = {"rows": rows, "import_seconds": seconds, "rows_per_second": rows / seconds if seconds else 0}
+    for name, cached in (("uncached", False), ("cached", True)):
+        latencies = time_get(statistics, paths, cached)
+        for percent in (50, 90, 99):
+            report[f"{name}_p{percent}_us"] = percentile(latencies, percent) * 1e6
+    return report
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:4]]
+    rows, players, games = arguments + [100000, 50, 10][len(arguments):]
+    handle, path = tempfile.mkstemp(suffix=".txt")
+    os.close(handle)
+    try:
+        generate(path, rows, players, games)
+        for key, value in benchmark(path).items():
+            print(f"{key}: {value:.1f}" if isinstance(value, float) else f"{key}: {value}")
+    finally:
+        os.remove(path)
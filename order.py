@@ -1,4 +1,14 @@
 """Order system."""
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count, repeat
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class OrderItem:
@@ -29,6 +39,157 @@ class OrderItem:
         return volume
 
 
+class OrderBook:
+    """
+    Many order items stored in columns.
+
+    Customer and item names are stored once and referred to by id, quantities and volumes
+    are kept in typed arrays, so an order line takes a few bytes instead of a Python object.
+    book[i] gives an OrderItemView that can be used where an OrderItem is expected.
+    """
+
+    def __init__(self):
+        """Initialize an empty order book."""
+        self.customer_names = []
+        self.customer_ids = {}
+        self.item_names = []
+        self.item_ids = {}
+        self.customers = array("i")
+        self.names = array("i")
+        self.quantities = array("q")
+        self.volumes = array("q")
+
+    @classmethod
+    def from_items(cls, items):
+        """
+        Create an order book from order items.
+
+        :param items: iterable of OrderItem.
+        :return: OrderBook.
+        """
+        book = cls()
+        for item in items:
+            book.add(item.customer, item.name, item.quantity, item.one_item_volume)
+        return book
+
+    def __len__(self):
+        """Return the number of order lines."""
+        return len(self.quantities)
+
+    def __getitem__(self, index: int):
+        """Return a view of order line index."""
+        if not -len(self) <= index < len(self):
+            raise IndexError("order book index out of range")
+        return OrderItemView(self, index % len(self))
+
+    def __iter__(self):
+        """Iterate over views of all order lines."""
+        return (OrderItemView(self, index) for index in range(len(self)))
+
+    def add(self, customer: str, name: str, quantity: int, one_item_volume: int) -> int:
+        """
+        Add an order line.
+
+        :param customer: requester name.
+        :param name: the name of the item.
+        :param quantity: quantity of items.
+        :param one_item_volume: the volume of one item.
+        :return: index of the line.
+        """
+        self.customers.append(self._intern(customer, self.customer_names, self.customer_ids))
+        self.names.append(self._intern(name, self.item_names, self.item_ids))
+        self.quantities.append(quantity)
+        self.volumes.append(one_item_volume)
+        return len(self.quantities) - 1
+
+    @staticmethod
+    def _intern(name: str, names: list, ids: dict) -> int:
+        """Return id of name, add it to names if it is new."""
+        if name not in ids:
+            ids[name] = len(names)
+            names.append(name)
+        return ids[name]
+
+    @property
+    def total_volume(self) -> int:
+        """
+        Return the total volume of all order lines.
+
+        :return: Total volume (cm^3) as int.
+        """
+        if np is not None:
+            return int(np.dot(np.frombuffer(self.quantities, dtype=np.int64), np.frombuffer(self.volumes, dtype=np.int64)))
+        return sum(quantity * volume for quantity, volume in zip(self.quantities, self.volumes))
+
+    def customer_totals(self) -> dict:
+        """
+        Sum quantities and volumes for every customer.
+
+        :return: dict {customer: (total quantity, total volume)}.
+        """
+        if np is not None:
+            customers = np.frombuffer(self.customers, dtype=np.int32)
+            quantities = np.frombuffer(self.quantities, dtype=np.int64)
+            volumes = quantities * np.frombuffer(self.volumes, dtype=np.int64)
+            size = len(self.customer_names)
+            quantity_sums = np.zeros(size, dtype=np.int64)
+            volume_sums = np.zeros(size, dtype=np.int64)
+            np.add.at(quantity_sums, customers, quantities)  # int64 sums, bincount would add in float64
+            np.add.at(volume_sums, customers, volumes)
+            return {name: (int(quantity_sums[i]), int(volume_sums[i])) for i, name in enumerate(self.customer_names)}
+        totals = {name: [0, 0] for name in self.customer_names}
+        for customer, quantity, volume in zip(self.customers, self.quantities, self.volumes):
+            total = totals[self.customer_names[customer]]
+            total[0] += quantity
+            total[1] += quantity * volume
+        return {name: tuple(total) for name, total in totals.items()}
+
+
+class OrderItemView:
+    """Read-only view of one order line in an OrderBook, usable like an OrderItem."""
+
+    __slots__ = ("book", "index")
+
+    def __init__(self, book: OrderBook, index: int):
+        """
+        Create a view.
+
+        :param book: the order book.
+        :param index: index of the order line.
+        """
+        self.book = book
+        self.index = index
+
+    @property
+    def customer(self) -> str:
+        """Return requester name."""
+        return self.book.customer_names[self.book.customers[self.index]]
+
+    @property
+    def name(self) -> str:
+        """Return the name of the item."""
+        return self.book.item_names[self.book.names[self.index]]
+
+    @property
+    def quantity(self) -> int:
+        """Return quantity of items."""
+        return self.book.quantities[self.index]
+
+    @property
+    def one_item_volume(self) -> int:
+        """Return the volume of one item."""
+        return self.book.volumes[self.index]
+
+    @property
+    def total_volume(self) -> int:
+        """
+        Calculate and return total volume the current order item.
+
+        :return: Total volume (cm^3), int.
+        """
+        return self.quantity * self.one_item_volume
+
+
 class Order:
     """Combination of order items of one customer."""
 
@@ -36,34 +197,55 @@ class Order:
         """
         Constructor that creates an order.
 
+        Total quantity and volume are counted once here and kept up to date by add_item and remove_item,
+        so change order items only through these methods.
+
         :param order_items: list of order items.
         """
         self.order_items = order_items
         self.destination = None
+        self._total_quantity = sum(order_item.quantity for order_item in order_items)
+        self._total_volume = sum(order_item.total_volume for order_item in order_items)
 
     @property
     def total_quantity(self) -> int:
         """
-        Calculate and return the sum of quantities of all items in the order.
+        Return the sum of quantities of all items in the order.
 
         :return: Total quantity as int.
         """
-        total_quantity = 0
-        for order_item in self.order_items:
-            total_quantity += order_item.quantity
-        return total_quantity
+        return self._total_quantity
 
     @property
     def total_volume(self) -> int:
         """
-        Calculate and return the total volume of all items in the order.
+        Return the total volume of all items in the order.
 
         :return: Total volume (cm^3) as int.
         """
-        total_volume = 0
-        for order in self.order_items:
-            total_volume += order.total_volume
-        return total_volume
+        return self._total_volume
+
+    def add_item(self, order_item: OrderItem):
+        """
+        Add order item to the order.
+
+        :param order_item: Item to add.
+        :return: None
+        """
+        self.order_items.append(order_item)
+        self._total_quantity += order_item.quantity
+        self._total_volume += order_item.total_volume
+
+    def remove_item(self, order_item: OrderItem):
+        """
+        Remove order item from the order.
+
+        :param order_item: Item to remove.
+        :return: None
+        """
+        self.order_items.remove(order_item)
+        self._total_quantity -= order_item.quantity
+        self._total_volume -= order_item.total_volume
 
 
 class Container:
@@ -73,27 +255,138 @@ class Container:
         """
         Constructor that creates a container.
 
+        Used volume is counted once here and kept up to date by add_order and remove_order,
+        so change orders only through these methods.
+
         :param volume: volume of container
         :param orders: list of orders
         """
         self.volume = volume
         self.orders = orders
+        self.used_volume = sum(order.total_volume for order in orders)
 
     @property
     def volume_left(self) -> int:
-        """Count how much volume left."""
-        total_volume = 0
-        for order in self.orders:
-            total_volume += order.total_volume
-        return self.volume - total_volume
+        """Return how much volume is left."""
+        return self.volume - self.used_volume
+
+    def add_order(self, order: Order):
+        """
+        Put order into the container.
+
+        :param order: Order to add.
+        :return: None
+        """
+        self.orders.append(order)
+        self.used_volume += order.total_volume
+
+    def remove_order(self, order: Order):
+        """
+        Take order out of the container.
+
+        :param order: Order to remove.
+        :return: None
+        """
+        self.orders.remove(order)
+        self.used_volume -= order.total_volume
+
+
+def greedy_fill(sizes: list, max_quantity: int, max_volume: int) -> list:
+    """
+    Choose items from the biggest volume to the smallest while they fit.
+
+    :param sizes: list of (quantity, volume) of items.
+    :param max_quantity: maximum total quantity.
+    :param max_volume: maximum total volume.
+    :return: sorted indexes of chosen items.
+    """
+    chosen = []
+    total_quantity = total_volume = 0
+    for index in sorted(range(len(sizes)), key=lambda i: sizes[i][1], reverse=True):
+        quantity, volume = sizes[index]
+        if total_quantity + quantity <= max_quantity and total_volume + volume <= max_volume:
+            chosen.append(index)
+            total_quantity += quantity
+            total_volume += volume
+    return sorted(chosen)
+
+
+def fill_knapsack(sizes: list, max_quantity: int, max_volume: int, time_budget: float = 1.0) -> list:
+    """
+    Choose items with the biggest total volume that fit both limits.
+
+    Dynamic programming keeps the smallest quantity for every reachable total volume.
+    If that takes longer than time_budget seconds, greedy_fill is used instead.
+
+    :param sizes: list of (quantity, volume) of items.
+    :param max_quantity: maximum total quantity.
+    :param max_volume: maximum total volume.
+    :param time_budget: seconds to spend before falling back to greedy_fill.
+    :return: sorted indexes of chosen items.
+    """
+    deadline = time.perf_counter() + time_budget
+    # total volume -> (total quantity, chosen items as linked (index, rest) pairs)
+    states = {0: (0, None)}
+    for index, (quantity, volume) in enumerate(sizes):
+        if time.perf_counter() > deadline:
+            return greedy_fill(sizes, max_quantity, max_volume)
+        if volume <= 0:
+            continue
+        updates = {}
+        for total_volume, (total_quantity, chosen) in states.items():
+            new_volume = total_volume + volume
+            new_quantity = total_quantity + quantity
+            if new_volume > max_volume or new_quantity > max_quantity:
+                continue
+            best = updates.get(new_volume) or states.get(new_volume)
+            if best is None or new_quantity < best[0]:
+                updates[new_volume] = (new_quantity, (index, chosen))
+        states.update(updates)
+
+    chosen = states[max(states)][1]
+    indexes = []
+    while chosen is not None:
+        index, chosen = chosen
+        indexes.append(index)
+    return sorted(indexes)
 
 
 class OrderAggregator:
     """Algorithm of aggregating orders."""
 
     def __init__(self):
-        """Initialize order aggregator."""
-        self.order_items = []
+        """
+        Initialize order aggregator.
+
+        Items are kept in insertion order in self.items and, for each customer, in self.customer_items.
+        Both are dicts keyed by the same item key, so an item can be removed from both in O(1).
+        """
+        self.items = {}
+        self.customer_items = {}
+        self.keys = count()
+
+    def __len__(self):
+        """Return the number of order items not yet put into an order."""
+        return len(self.items)
+
+    @property
+    def order_items(self) -> list:
+        """
+        Return all order items not yet put into an order, in the order they were added.
+
+        The list is a copy, add and remove items with add_item, add_items and remove_item.
+
+        :return: list of order items.
+        """
+        return list(self.items.values())
+
+    @order_items.setter
+    def order_items(self, items):
+        """Replace all waiting order items with items."""
+        items = list(items)
+        self.items.clear()
+        self.customer_items.clear()
+        self.add_items(items)
 
     def add_item(self, item: OrderItem):
         """
@@ -102,7 +395,46 @@ class OrderAggregator:
         :param item: Item to add.
         :return: None
         """
-        self.order_items.append(item)
+        key = next(self.keys)
+        self.items[key] = item
+        self.customer_items.setdefault(item.customer, {})[key] = item
+
+    def add_items(self, items):
+        """
+        Add many order items to the aggregator.
+
+        Same as calling add_item for every item, with less overhead per item.
+
+        :param items: iterable of items to add.
+        :return: None
+        """
+        all_items = self.items
+        customer_items = self.customer_items
+        keys = self.keys
+        for item in items:
+            key = next(keys)
+            all_items[key] = item
+            bucket = customer_items.get(item.customer)
+            if bucket is None:
+                bucket = customer_items[item.customer] = {}
+            bucket[key] = item
+
+    def remove_item(self, item: OrderItem):
+        """
+        Remove order item from the aggregator.
+
+        :param item: Item to remove, the first added item equal to it is removed.
+        :return: None
+        """
+        bucket = self.customer_items.get(getattr(item, "customer", None), {})
+        for key, order_item in bucket.items():
+            if order_item == item:
+                del bucket[key]
+                del self.items[key]
+                if not bucket:
+                    del self.customer_items[item.customer]
+                return
+        raise ValueError("order item is not in the aggregator")
 
     def aggregate_order(self, customer: str, max_items_quantity: int, max_volume: int):
         """
@@ -119,19 +451,252 @@ class OrderAggregator:
         items = []
         total_volume = 0
         total_amount = 0
-        order_items = list(filter(lambda x: x.customer == customer, self.order_items))
-        for order_item in order_items:
+        customer_items = self.customer_items.get(customer, {})
+        for key, order_item in list(customer_items.items()):
             total_volume += order_item.total_volume
             total_amount += order_item.quantity
             if total_amount <= max_items_quantity and total_volume <= max_volume:
                 items.append(order_item)
-                self.order_items.remove(order_item)
+                del customer_items[key]
+                del self.items[key]
             else:
                 total_volume -= order_item.total_volume
                 total_amount -= order_item.quantity
+        if not customer_items:
+            self.customer_items.pop(customer, None)
+        return Order(items)
+
+    def aggregate_order_optimal(self, customer: str, max_items_quantity: int, max_volume: int,
+                                time_budget: float = 1.0):
+        """
+        Create an order for customer which fills as much of max_volume as possible.
+
+        Unlike aggregate_order, which takes items in the order they were added, this chooses
+        the items with fill_knapsack (greedy_fill if it takes longer than time_budget seconds).
+
+        :param customer: Customer's name to create an order for.
+        :param max_items_quantity: Maximum amount on items in order.
+        :param max_volume: Maximum volume of order. All items volumes must not exceed this value.
+        :param time_budget: seconds to spend on finding the best order.
+        :return: Order.
+        """
+        customer_items = self.customer_items.get(customer, {})
+        keys = list(customer_items)
+        sizes = [(customer_items[key].quantity, customer_items[key].total_volume) for key in keys]
+        items = []
+        for index in fill_knapsack(sizes, max_items_quantity, max_volume, time_budget):
+            items.append(customer_items.pop(keys[index]))
+            del self.items[keys[index]]
+        if not customer_items:
+            self.customer_items.pop(customer, None)
         return Order(items)
 
 
+class FirstFit:
+    """
+    Find the first container with enough volume left.
+
+    Volumes left are kept in a max segment tree over the containers, so finding
+    and updating a container is O(log n).
+    """
+
+    def __init__(self):
+        """Initialize an empty tree."""
+        self.size = 1
+        self.count = 0
+        self.tree = [-1, -1]
+
+    def add(self, volume_left: int) -> int:
+        """
+        Add a container to the end.
+
+        :param volume_left: volume left in the new container.
+        :return: index of the container.
+        """
+        if self.count == self.size:
+            leaves = self.tree[self.size:] + [-1] * self.size
+            self.size *= 2
+            self.tree = [-1] * self.size + leaves
+            for i in range(self.size - 1, 0, -1):
+                self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+        self.count += 1
+        self.update(self.count - 1, volume_left)
+        return self.count - 1
+
+    def update(self, index: int, volume_left: int):
+        """
+        Set the volume left in container.
+
+        :param index: index of the container.
+        :param volume_left: new volume left.
+        """
+        i = index + self.size
+        self.tree[i] = volume_left
+        while i > 1:
+            i //= 2
+            self.tree[i] = max(self.tree[2 * i], self.tree[2 * i + 1])
+
+    def find(self, volume: int):
+        """
+        Find the first container with at least volume left.
+
+        :param volume: volume needed.
+        :return: index of the container or None.
+        """
+        if self.tree[1] < volume:
+            return None
+        i = 1
+        while i < self.size:
+            i = 2 * i if self.tree[2 * i] >= volume else 2 * i + 1
+        return i - self.size
+
+
+class BestFit:
+    """
+    Find the container with the least volume left that is still enough.
+
+    Containers are kept in a treap (a search tree balanced by random priorities) ordered by
+    (volume left, index), so adding, updating and finding a container is O(log n) on average.
+    Container indexes are the tree nodes, left and right hold the children (-1 for none).
+    """
+
+    def __init__(self):
+        """Initialize with no containers."""
+        self.volumes = []
+        self.priorities = []
+        self.left = []
+        self.right = []
+        self.root = -1
+        self.random = random.Random(0)
+
+    def add(self, volume_left: int) -> int:
+        """
+        Add a container.
+
+        :param volume_left: volume left in the new container.
+        :return: index of the container.
+        """
+        index = len(self.volumes)
+        self.volumes.append(volume_left)
+        self.priorities.append(self.random.random())
+        self.left.append(-1)
+        self.right.append(-1)
+        self._insert(index)
+        return index
+
+    def update(self, index: int, volume_left: int):
+        """
+        Set the volume left in container.
+
+        :param index: index of the container.
+        :param volume_left: new volume left.
+        """
+        self._remove(index)
+        self.volumes[index] = volume_left
+        self._insert(index)
+
+    def find(self, volume: int):
+        """
+        Find the container with the least volume left that is at least volume.
+
+        :param volume: volume needed.
+        :return: index of the container or None.
+        """
+        node = self.root
+        best = None
+        while node != -1:
+            if self.volumes[node] >= volume:
+                best = node
+                node = self.left[node]
+            else:
+                node = self.right[node]
+        return best
+
+    def _before(self, node: int, other: int) -> bool:
+        """Return whether node comes before other in (volume left, index) order."""
+        return self.volumes[node] < self.volumes[other] or (self.volumes[node] == self.volumes[other] and node < other)
+
+    def _insert(self, node: int):
+        """Insert node below the last node with a higher priority, splitting the subtree found there."""
+        parent, is_left, tree = -1, False, self.root
+        while tree != -1 and self.priorities[tree] > self.priorities[node]:
+            parent, is_left = tree, self._before(node, tree)
+            tree = self.left[tree] if is_left else self.right[tree]
+        self.left[node], self.right[node] = self._split(tree, node)
+        self._link(parent, is_left, node)
+
+    def _remove(self, node: int):
+        """Remove node from the tree, its subtrees are merged in its place."""
+        parent, is_left, tree = -1, False, self.root
+        while tree != node:
+            parent, is_left = tree, self._before(node, tree)
+            tree = self.left[tree] if is_left else self.right[tree]
+        self._link(parent, is_left, self._merge(self.left[node], self.right[node]))
+
+    def _link(self, parent: int, is_left: bool, child: int):
+        """Make child the left or right child of parent, or the root if parent is -1."""
+        if parent == -1:
+            self.root = child
+        elif is_left:
+            self.left[parent] = child
+        else:
+            self.right[parent] = child
+
+    def _split(self, tree: int, node: int) -> tuple:
+        """Split tree into (tree of nodes before node, tree of nodes after node)."""
+        if tree == -1:
+            return -1, -1
+        if self._before(tree, node):
+            self.right[tree], after = self._split(self.right[tree], node)
+            return tree, after
+        before, self.left[tree] = self._split(self.left[tree], node)
+        return before, tree
+
+    def _merge(self, before: int, after: int) -> int:
+        """Merge two trees where every node of before comes before every node of after, return the root."""
+        if before == -1:
+            return after
+        if after == -1:
+            return before
+        if self.priorities[before] > self.priorities[after]:
+            self.right[before] = self._merge(self.right[before], after)
+            return before
+        self.left[after] = self._merge(before, self.left[after])
+        return after
+
+
+PACKING_STRATEGIES = {
+    "first-fit": (FirstFit, False),
+    "first-fit-decreasing": (FirstFit, True),
+    "best-fit": (BestFit, False),
+    "best-fit-decreasing": (BestFit, True),
+}
+
+
+def pack_volumes(volumes: list, container_volume: int, finder_class=FirstFit) -> list:
+    """
+    Pack volumes into containers in the given order.
+
+    :param volumes: volumes to pack, none bigger than container_volume.
+    :param container_volume: volume of each container.
+    :param finder_class: FirstFit or BestFit.
+    :return: list with index of the container for every volume.
+    """
+    finder = finder_class()
+    volumes_left = []
+    assignment = []
+    for volume in volumes:
+        index = finder.find(volume)
+        if index is None:
+            index = finder.add(container_volume - volume)
+            volumes_left.append(container_volume - volume)
+        else:
+            volumes_left[index] -= volume
+            finder.update(index, volumes_left[index])
+        assignment.append(index)
+    return assignment
+
+
 class ContainerAggregator:
     """Algorithm to prepare containers."""
 
@@ -144,32 +709,62 @@ class ContainerAggregator:
         self.container_volume = container_volume
         self.not_used_orders = []
 
-    def prepare_containers(self, orders: tuple) -> dict:
+    def prepare_containers(self, orders: tuple, strategy: str = "first-fit", workers: int = 1) -> dict:
         """
         Create containers and put orders to them.
 
         If order cannot be put to a container, it is added to self.not_used_orders list.
+        Strategy is a key of PACKING_STRATEGIES: "first-fit" puts every order to the first container
+        it fits in, "best-fit" to the fullest container it fits in. "-decreasing" versions
+        handle orders from the biggest to the smallest, which usually needs fewer containers.
+        Destinations are packed separately. With workers other than 1 they are packed in a process pool
+        of that many processes (None for all cores), the result is the same.
 
         :param orders: tuple of orders.
+        :param strategy: packing strategy.
+        :param workers: number of processes.
         :return: dict where keys are destinations and values are containers to that destination with orders.
         """
-        container_dict = {}
+        finder_class, decreasing = PACKING_STRATEGIES[strategy]
+        if decreasing:
+            orders = sorted(orders, key=lambda order: order.total_volume, reverse=True)
+        destinations = {}
         for order in orders:
-            added_check = False
             if order.total_volume > self.container_volume:
                 self.not_used_orders.append(order)
-                continue
-            if order.destination not in container_dict:
-                container_dict[order.destination] = [Container(self.container_volume, [])]
-            for container in container_dict[order.destination]:
-                if order.total_volume <= container.volume_left and not added_check:
-                    container.orders.append(order)
-                    added_check = True
-                    continue
-            if not added_check:
-                container_dict[order.destination].append(Container(self.container_volume, [order]))
+            else:
+                destinations.setdefault(order.destination, []).append(order)
+
+        volumes = [[order.total_volume for order in destination] for destination in destinations.values()]
+        if workers == 1 or len(destinations) < 2:
+            assignments = [pack_volumes(volume_list, self.container_volume, finder_class) for volume_list in volumes]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                assignments = list(executor.map(pack_volumes, volumes, repeat(self.container_volume),
+                                                 repeat(finder_class), chunksize=max(1, len(volumes) // 64)))
+
+        container_dict = {}
+        for (destination, destination_orders), assignment in zip(destinations.items(), assignments):
+            containers = container_dict[destination] = []
+            for order, index in zip(destination_orders, assignment):
+                if index == len(containers):
+                    containers.append(Container(self.container_volume, [order]))
+                else:
+                    containers[index].add_order(order)
         return container_dict
 
+    def packing_report(self, container_dict: dict) -> dict:
+        """
+        Count containers and how full they are.
+
+        :param container_dict: result of prepare_containers.
+        :return: dict with number of containers and fill ratio (used volume / total volume of containers).
+        """
+        containers = [container for destination in container_dict.values() for container in destination]
+        total = sum(container.volume for container in containers)
+        used = sum(container.volume - container.volume_left for container in containers)
+        return {"containers": len(containers), "fill_ratio": used / total if total else 0.0}
+
 
 if __name__ == '__main__':
     print("Order items")
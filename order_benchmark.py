@@ -0,0 +1,37 @@
+"""Compare greedy and optimal order aggregation."""
+import random
+import sys
+import time
+
+from order import OrderAggregator, OrderItem
+
+
+def make_aggregator(customers: int, items: int, seed: int = 0) -> OrderAggregator:
+    """Return an OrderAggregator with items random order items for customers customers."""
+    rng = random.Random(seed)
+    aggregator = OrderAggregator()
+    for i in range(items):
+        aggregator.add_item(OrderItem(f"customer{i % customers}", f"item{i}", rng.randint(1, 20), rng.randint(1, 500)))
+    return aggregator
+
+
+def compare(customers: int = 100, items: int = 2000, max_quantity: int = 100, max_volume: int = 20000) -> dict:
+    """
+    Aggregate one order per customer with aggregate_order and with aggregate_order_optimal.
+
+    :return: dict {method: (seconds, filled volume / (customers * max_volume))}.
+    """
+    report = {}
+    for method in ("aggregate_order", "aggregate_order_optimal"):
+        aggregator = make_aggregator(customers, items)
+        aggregate = getattr(aggregator, method)
+        start = time.perf_counter()
+        filled = sum(aggregate(f"customer{i}", max_quantity, max_volume).total_volume for i in range(customers))
+        report[method] = (time.perf_counter() - start, filled / (customers * max_volume))
+    return report
+
+
+if __name__ == "__main__":
+    arguments = [int(argument) for argument in sys.argv[1:5]]
+    for name, (seconds, utilization) in compare(*arguments).items():
+        print(f"{name}: {seconds:.3f} s, utilization {utilization:.1%}")
@@ -0,0 +1,133 @@
+"""Load order lines from CSV or JSONL files."""
+import csv
+import json
+import sys
+from itertools import islice
+
+from order import OrderAggregator, OrderItem
+
+FIELDS = ("customer", "name", "quantity", "one_item_volume")
+
+
+def read_rows(filename: str):
+    """
+    Yield (line number, dict) for every order line in a file.
+
+    Files ending with .jsonl or .json have one JSON object per line, other files are CSV
+    with a header row naming the FIELDS.
+    """
+    with open(filename, newline="", encoding="utf-8") as file:
+        if filename.endswith((".jsonl", ".json")):
+            for line_number, line in enumerate(file, 1):
+                if line.strip():
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as error:
+                        raise ValueError(f"Line {line_number}: invalid JSON: {error.msg}")
+                    yield line_number, row
+        else:
+            reader = csv.DictReader(file)
+            for row in reader:
+                yield reader.line_num, row
+
+
+def whole_number(value) -> int:
+    """Return value as int, raise ValueError if it is not a whole number (e.g. 2.9, True or "abc")."""
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(value)
+        return int(value)
+    if isinstance(value, (int, str)):
+        return int(value)
+    raise ValueError(value)
+
+
+def make_item(line_number: int, row: dict) -> OrderItem:
+    """
+    Validate a row and turn it into an OrderItem.
+
+    :param line_number: line of the row, used in error messages.
+    :param row: dict with FIELDS.
+    :return: OrderItem.
+    """
+    if not isinstance(row, dict):
+        raise ValueError(f"Line {line_number}: an order line must be an object with {', '.join(FIELDS)}")
+    missing = [field for field in FIELDS if row.get(field) in (None, "")]
+    if missing:
+        raise ValueError(f"Line {line_number}: missing {', '.join(missing)}")
+    try:
+        quantity = whole_number(row["quantity"])
+        one_item_volume = whole_number(row["one_item_volume"])
+    except (OverflowError, ValueError):
+        raise ValueError(f"Line {line_number}: quantity and one_item_volume must be whole numbers")
+    if quantity < 0 or one_item_volume < 0:
+        raise ValueError(f"Line {line_number}: quantity and one_item_volume must not be negative")
+    return OrderItem(str(row["customer"]), str(row["name"]), quantity, one_item_volume)
+
+
+def read_items(filename: str, chunk_size: int = 10000):
+    """Yield lists of at most chunk_size OrderItems read from filename."""
+    items = (make_item(line_number, row) for line_number, row in read_rows(filename))
+    chunk = list(islice(items, chunk_size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(items, chunk_size))
+
+
+def load_items(aggregator: OrderAggregator, filename: str, chunk_size: int = 10000) -> int:
+    """
+    Add all order lines of filename to aggregator, reading chunk_size lines at a time.
+
+    :return: number of order items added.
+    """
+    added = 0
+    for chunk in read_items(filename, chunk_size):
+        aggregator.add_items(chunk)
+        added += len(chunk)
+    return added
+
+
+def stream_orders(aggregator: OrderAggregator, filename: str, max_items_quantity: int, max_volume: int,
+                  chunk_size: int = 10000):
+    """
+    Add order lines of filename to aggregator and yield orders as soon as customers have enough items.
+
+    After every chunk, customers whose waiting items reach max_items_quantity or max_volume get
+    orders made with aggregate_order. Items that are too big for any order are not counted, they
+    stay in the aggregator like the items left at the end of the file.
+    A malformed line raises ValueError and stops reading, chunks before it have already been added.
+    """
+    waiting = {}
+    for chunk in read_items(filename, chunk_size):
+        aggregator.add_items(chunk)
+        for item in chunk:
+            if item.quantity > max_items_quantity or item.total_volume > max_volume:
+                continue
+            totals = waiting.setdefault(item.customer, [0, 0])
+            totals[0] += item.quantity
+            totals[1] += item.total_volume
+        for customer in dict.fromkeys(item.customer for item in chunk):
+            totals = waiting.get(customer, [0, 0])
+            while totals[0] >= max_items_quantity or totals[1] >= max_volume:
+                order = aggregator.aggregate_order(customer, max_items_quantity, max_volume)
+                if not order.order_items:
+                    break
+                yield order
+                totals[0] -= order.total_quantity
+                totals[1] -= order.total_volume
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python order_loader.py ORDER_FILE [MAX_QUANTITY MAX_VOLUME]")
+        sys.exit(1)
+    order_aggregator = OrderAggregator()
+    if len(sys.argv) > 3:
+        orders = 0
+        for _ in stream_orders(order_aggregator, sys.argv[1], int(sys.argv[2]), int(sys.argv[3])):
+            orders += 1
+        print(f"{orders} orders made, {len(order_aggregator)} order items waiting")
+    else:
+        print(f"{load_items(order_aggregator, sys.argv[1])} order items added")
@@ -1,13 +1,54 @@
 """Simple Poker implementation."""
+from itertools import combinations, combinations_with_replacement
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+VALUES = ("2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A")
+SUITS = ("diamonds", "clubs", "hearts", "spades")
+
+HIGH_CARD, PAIR, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH = range(8)
+HAND_TYPES = ("high card", "pair", "three of a kind", "straight", "flush", "full house", "four of a kind",
+              "straight flush")
+
+_RANK_INDEX = {value: i for i, value in enumerate(VALUES)}
+_SUIT_INDEX = {suit: i for i, suit in enumerate(SUITS)}
+_PRIMES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def _encode(rank: int, suit: int) -> int:
+    """
+    Encode a card as a small integer.
+
+    Bits 16-28 hold one bit for the value, bits 12-15 one bit for the suit,
+    bits 8-11 the value index (0 for "2", 12 for "A") and bits 0-7 a prime unique to the value.
+    """
+    return (1 << (16 + rank)) | (1 << (12 + suit)) | (rank << 8) | _PRIMES[rank]
 
 
 class Card:
-    """A card in a poker game."""
+    """
+    A card in a poker game.
+
+    Besides value and suit the card keeps its value index (rank), suit index, encoded form (code)
+    and a sort key, all computed once. These are None if the value or suit is not valid.
+    """
+
+    __slots__ = ("value", "suit", "rank", "suit_index", "code", "sort_key")
 
     def __init__(self, value, suit):
         """Initialze Card."""
         self.value = value
         self.suit = suit
+        self.rank = _RANK_INDEX.get(value)
+        self.suit_index = _SUIT_INDEX.get(suit)
+        if self.rank is None or self.suit_index is None:
+            self.code = self.sort_key = None
+        else:
+            self.code = _encode(self.rank, self.suit_index)
+            self.sort_key = self.rank * len(SUITS) + self.suit_index
 
     def __repr__(self):
         """
@@ -20,27 +61,274 @@ class Card:
         return f"{self.value} of {self.suit}"
 
 
+DECK = tuple(Card(value, suit) for value in VALUES for suit in SUITS)
+_CARDS = {(card.value, card.suit): card for card in DECK}
+
+
+def get_card(value, suit) -> Card:
+    """
+    Return the shared card from DECK.
+
+    Use this instead of Card() to avoid creating a new object for every card dealt.
+    Invalid cards are not in DECK, for them a new Card is returned.
+    """
+    return _CARDS.get((value, suit)) or Card(value, suit)
+
+
+def encode_card(card: Card) -> int:
+    """Return the card encoded as a small integer (see _encode), None for an invalid card."""
+    return card.code
+
+
+# Ranks are ordered by tier first. Tiers are HAND_TYPES codes except that two pair gets its own tier
+# (it is still reported as "pair").
+_TIER_TYPES = (HIGH_CARD, PAIR, PAIR, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, FOUR_OF_A_KIND, STRAIGHT_FLUSH)
+(_HIGH_CARD_TIER, _PAIR_TIER, _TWO_PAIR_TIER, _THREE_TIER, _STRAIGHT_TIER, _FLUSH_TIER, _FULL_HOUSE_TIER,
+ _FOUR_TIER, _STRAIGHT_FLUSH_TIER) = range(9)
+_STRAIGHT_MASKS = tuple(0b11111 << i for i in range(len(VALUES) - 5, -1, -1))
+
+
+def _rank(tier: int, ranks) -> int:
+    """Return the rank of a hand: tier in bits 20-23 and the deciding value indexes in 4-bit groups below it."""
+    rank = tier << 20
+    for i, value_rank in enumerate(ranks):
+        rank |= value_rank << (16 - 4 * i)
+    return rank
+
+
+def _build_tables():
+    """
+    Precompute lookup tables for every 5-card value combination.
+
+    Hands with five different values are looked up by the value bitmask (one table for flushes,
+    one for the rest), all others by the product of the value primes. Tables hold hand ranks.
+    """
+    flushes, unique5, products = {}, {}, {}
+    for ranks in combinations(range(len(VALUES) - 1, -1, -1), 5):
+        mask = sum(1 << rank for rank in ranks)
+        straight = mask in _STRAIGHT_MASKS
+        flushes[mask] = _rank(_STRAIGHT_FLUSH_TIER if straight else _FLUSH_TIER, ranks)
+        unique5[mask] = _rank(_STRAIGHT_TIER if straight else _HIGH_CARD_TIER, ranks)
+    for ranks in combinations_with_replacement(range(len(VALUES) - 1, -1, -1), 5):
+        groups = sorted(set(ranks), key=lambda rank: (ranks.count(rank), rank), reverse=True)
+        counts = [ranks.count(rank) for rank in groups]
+        if counts[0] == 5 or len(counts) == 5:
+            continue
+        product = 1
+        for rank in ranks:
+            product *= _PRIMES[rank]
+        if counts[0] == 4:
+            tier = _FOUR_TIER
+        elif counts[:2] == [3, 2]:
+            tier = _FULL_HOUSE_TIER
+        elif counts[0] == 3:
+            tier = _THREE_TIER
+        elif counts[:2] == [2, 2]:
+            tier = _TWO_PAIR_TIER
+        else:
+            tier = _PAIR_TIER
+        products[product] = _rank(tier, groups)
+    return flushes, unique5, products
+
+
+_FLUSHES, _UNIQUE5, _PRODUCTS = _build_tables()
+
+
+def rank_hand_type(rank: int) -> int:
+    """Return the hand type code (index into HAND_TYPES) of a hand rank."""
+    return _TIER_TYPES[rank >> 20]
+
+
+def rank_five(c1: int, c2: int, c3: int, c4: int, c5: int) -> int:
+    """
+    Return the rank of five encoded cards.
+
+    Of two hands the one with the higher rank wins, equal ranks are a tie.
+    """
+    mask = (c1 | c2 | c3 | c4 | c5) >> 16
+    if c1 & c2 & c3 & c4 & c5 & 0xF000:
+        return _FLUSHES[mask]
+    if mask in _UNIQUE5:
+        return _UNIQUE5[mask]
+    return _PRODUCTS[(c1 & 0xFF) * (c2 & 0xFF) * (c3 & 0xFF) * (c4 & 0xFF) * (c5 & 0xFF)]
+
+
+def evaluate_five(c1: int, c2: int, c3: int, c4: int, c5: int) -> int:
+    """
+    Return the hand type code of five encoded cards.
+
+    The code is an index into HAND_TYPES, a higher code is a stronger hand.
+    """
+    return _TIER_TYPES[rank_five(c1, c2, c3, c4, c5) >> 20]
+
+
+def _top_ranks(mask: int, amount: int) -> list:
+    """Return the amount highest value indexes set in a value bitmask."""
+    ranks = []
+    rank = len(VALUES) - 1
+    while len(ranks) < amount and rank >= 0:
+        if mask >> rank & 1:
+            ranks.append(rank)
+        rank -= 1
+    return ranks
+
+
+def _straight_top(mask: int):
+    """Return the highest value index of the best straight in a value bitmask, None if there is none."""
+    for straight in _STRAIGHT_MASKS:
+        if mask & straight == straight:
+            return straight.bit_length() - 1
+    return None
+
+
+def rank_seven(codes) -> int:
+    """
+    Return the rank of the best 5-card hand from 5 to 7 encoded cards.
+
+    Value and suit counts are built in one pass and the best hand is read from them,
+    so the 21 five-card subsets of seven cards are never formed.
+    Use rank_hand_type to get the hand type of the result.
+    """
+    counts = [0] * len(VALUES)
+    suit_masks = {}
+    mask = 0
+    for code in codes:
+        rank = code >> 8 & 0xF
+        counts[rank] += 1
+        mask |= 1 << rank
+        suit = code & 0xF000
+        suit_masks[suit] = suit_masks.get(suit, 0) | 1 << rank
+
+    for suit_mask in suit_masks.values():
+        if bin(suit_mask).count("1") >= 5:
+            top = _straight_top(suit_mask)
+            if top is not None:
+                return _rank(_STRAIGHT_FLUSH_TIER, range(top, top - 5, -1))
+            # With at most 7 cards a flush leaves too few cards for four of a kind or a full house.
+            return _rank(_FLUSH_TIER, _top_ranks(suit_mask, 5))
+
+    groups = {1: [], 2: [], 3: [], 4: []}
+    for rank in range(len(VALUES) - 1, -1, -1):
+        if counts[rank]:
+            groups[counts[rank]].append(rank)
+    if groups[4]:
+        quad = groups[4][0]
+        return _rank(_FOUR_TIER, [quad] + _top_ranks(mask & ~(1 << quad), 1))
+    if groups[3] and len(groups[3]) + len(groups[2]) >= 2:
+        trips = groups[3][0]
+        return _rank(_FULL_HOUSE_TIER, [trips, max(groups[3][1:] + groups[2])])
+    top = _straight_top(mask)
+    if top is not None:
+        return _rank(_STRAIGHT_TIER, range(top, top - 5, -1))
+    if groups[3]:
+        trips = groups[3][0]
+        return _rank(_THREE_TIER, [trips] + _top_ranks(mask & ~(1 << trips), 2))
+    if len(groups[2]) >= 2:
+        high, low = groups[2][:2]
+        return _rank(_TWO_PAIR_TIER, [high, low] + _top_ranks(mask & ~(1 << high) & ~(1 << low), 1))
+    if groups[2]:
+        pair = groups[2][0]
+        return _rank(_PAIR_TIER, [pair] + _top_ranks(mask & ~(1 << pair), 3))
+    return _rank(_HIGH_CARD_TIER, _top_ranks(mask, 5))
+
+
+def evaluate_hands(cards):
+    """
+    Return the hand type codes of many hands at once.
+
+    cards is an N x 5 array of encoded cards (see encode_card), one hand per row.
+    Values are counted for all rows with a single bincount, no Hand objects are created.
+    Return an array of N hand type codes (indexes into HAND_TYPES).
+    """
+    if np is None:
+        raise ImportError("evaluate_hands requires numpy")
+    cards = np.asarray(cards, dtype=np.int64).reshape(-1, 5)
+    rows = len(cards)
+    ranks = (cards >> 8) & 0xF
+    offsets = np.arange(rows, dtype=np.int64)[:, None] * len(VALUES)
+    counts = np.bincount((ranks + offsets).ravel(), minlength=rows * len(VALUES)).reshape(rows, len(VALUES))
+    most = counts.max(axis=1)
+    has_pair = (counts == 2).any(axis=1)
+    mask = np.bitwise_or.reduce(cards, axis=1) >> 16
+    straight = (most == 1) & np.isin(mask, [0b11111 << i for i in range(len(VALUES) - 4)])
+    flush = (np.bitwise_and.reduce(cards, axis=1) & 0xF000) != 0
+
+    result = np.full(rows, HIGH_CARD, dtype=np.int8)
+    result[most == 2] = PAIR
+    result[most == 3] = THREE_OF_A_KIND
+    result[straight] = STRAIGHT
+    result[flush] = FLUSH
+    result[(most == 3) & has_pair] = FULL_HOUSE
+    result[most == 4] = FOUR_OF_A_KIND
+    result[straight & flush] = STRAIGHT_FLUSH
+    return result
+
+
+def rank_hands(cards):
+    """
+    Return the ranks (see rank_five) of many hands at once.
+
+    cards is an N x 5 array of encoded cards, one hand per row. The result is an int64 array,
+    so np.argsort or np.sort on it orders thousands of hands in one call.
+    """
+    if np is None:
+        raise ImportError("rank_hands requires numpy")
+    cards = np.asarray(cards, dtype=np.int64).reshape(-1, 5)
+    rows = len(cards)
+    ranks = (cards >> 8) & 0xF
+    offsets = np.arange(rows, dtype=np.int64)[:, None] * len(VALUES)
+    counts = np.bincount((ranks + offsets).ravel(), minlength=rows * len(VALUES)).reshape(rows, len(VALUES))
+
+    # Sort the cards of every row by (count, value), the first card of each value gets the next 4-bit group.
+    ordered = np.sort(np.take_along_axis(counts, ranks, axis=1) * 16 + ranks, axis=1)[:, ::-1] & 0xF
+    first = np.ones(ordered.shape, dtype=bool)
+    first[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+    shifts = 16 - 4 * (np.cumsum(first, axis=1) - 1)
+    values = np.where(first, ordered << np.maximum(shifts, 0), 0).sum(axis=1)
+
+    most = counts.max(axis=1)
+    pairs = (counts == 2).sum(axis=1)
+    mask = np.bitwise_or.reduce(cards, axis=1) >> 16
+    straight = (most == 1) & np.isin(mask, _STRAIGHT_MASKS)
+    flush = (np.bitwise_and.reduce(cards, axis=1) & 0xF000) != 0
+
+    tiers = np.full(rows, _HIGH_CARD_TIER, dtype=np.int64)
+    tiers[pairs == 1] = _PAIR_TIER
+    tiers[pairs == 2] = _TWO_PAIR_TIER
+    tiers[most == 3] = _THREE_TIER
+    tiers[straight] = _STRAIGHT_TIER
+    tiers[flush] = _FLUSH_TIER
+    tiers[(most == 3) & (pairs == 1)] = _FULL_HOUSE_TIER
+    tiers[most == 4] = _FOUR_TIER
+    tiers[straight & flush] = _STRAIGHT_FLUSH_TIER
+    return tiers << 20 | values
+
+
 class Hand:
     """The hand in a poker game."""
 
+    __slots__ = ("card_dict", "hand", "positions", "suit_counts", "_rank")
+
+    suits = frozenset(SUITS)
+    values = frozenset(VALUES)
+
     def __init__(self):
-        """Initialize Hand."""
+        """
+        Initialize Hand.
+
+        card_dict (cards per value), positions (index in hand per card sort key) and
+        suit_counts (cards per suit index) are kept up to date by add_card and remove_card.
+        The hand rank is cached until the next change.
+        """
         self.card_dict = {}
         self.hand = []
-        self.suits = ["diamonds", "clubs", "hearts", "spades"]
-        self.values = ["2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K", "A"]
+        self.positions = {}
+        self.suit_counts = [0] * len(SUITS)
+        self._rank = None
 
     def card_count(self):
-        """Put cards in a dictionary."""
-        for card in self.hand:
-            self.card_dict[card.value] = 0
-        for card in self.hand:
-            if card.value in self.card_dict:
-                self.card_dict[card.value] += 1
-            else:
-                self.card_dict[card.value] = 1
-        a = sorted(self.card_dict.items(), key=lambda i: i[1], reverse=True)
-        return a
+        """Return (value, count) pairs of the cards in hand, most common first."""
+        return sorted(self.card_dict.items(), key=lambda i: i[1], reverse=True)
 
     def can_add_card(self, card: Card) -> bool:
         """
@@ -51,15 +339,9 @@ class Hand:
         - The player is holding less than five cards
         - The card has both a valid value and a valid suite.
         """
-        can_add = True
-        if len(self.hand) >= 5:
-            can_add = False
-        for i in range(len(self.hand)):
-            if (card.value == self.hand[i].value) and (card.suit == self.hand[i].suit):
-                can_add = False
-        if card.value not in self.values or card.suit not in self.suits:
-            can_add = False
-        return can_add
+        if len(self.hand) >= 5 or card.sort_key in self.positions:
+            return False
+        return card.value in self.values and card.suit in self.suits
 
     def add_card(self, card: Card):
         """
@@ -68,9 +350,11 @@ class Hand:
         Before adding a card, you would have to check if it can be added.
         """
         if self.can_add_card(card) is True:
+            self.positions[card.sort_key] = len(self.hand)
             self.hand.append(card)
-        else:
-            pass
+            self.card_dict[card.value] = self.card_dict.get(card.value, 0) + 1
+            self.suit_counts[card.suit_index] += 1
+            self._rank = None
 
     def can_remove_card(self, card: Card):
         """
@@ -78,19 +362,26 @@ class Hand:
 
         The only consideration should be that the card is already being held.
         """
-        if card in self.hand:
-            return True
-        else:
-            return False
+        return card.sort_key is not None and card.sort_key in self.positions
 
     def remove_card(self, card: Card):
         """
         Remove a card from hand.
 
         Before removing the card, you would have to check if it can be removed.
+        The last card in hand takes the place of the removed one.
         """
         if self.can_remove_card(card) is True:
-            self.hand.remove(card)
+            index = self.positions.pop(card.sort_key)
+            last = self.hand.pop()
+            if index < len(self.hand):
+                self.hand[index] = last
+                self.positions[last.sort_key] = index
+            self.card_dict[card.value] -= 1
+            if self.card_dict[card.value] == 0:
+                del self.card_dict[card.value]
+            self.suit_counts[card.suit_index] -= 1
+            self._rank = None
 
     def get_cards(self):
         """Return a list of cards as objects."""
@@ -137,11 +428,7 @@ class Hand:
 
         In a flush hand all cards are the same suit. Their number value is not important here.
         """
-        for i in range(len(self.hand)):
-            if self.hand[i].suit == self.hand[i + 1].suit == self.hand[i + 2].suit == self.hand[i + 3].suit == self.hand[i + 4].suit:
-                return True
-            else:
-                return False
+        return len(self.hand) == 5 and 5 in self.suit_counts
 
     def is_straight_flush(self):
         """
@@ -233,26 +520,22 @@ class Hand:
         "high card" - None of the above
 
         """
-        hand_type = None
         if len(self.hand) < 5:
-            hand_type = None
-        elif self.is_straight_flush() is True:
-            hand_type = "straight flush"
-        elif self.is_flush() is True:
-            hand_type = "flush"
-        elif self.is_straight() is True:
-            hand_type = "straight"
-        elif self.is_full_house() is True:
-            hand_type = "full house"
-        elif self.is_four_of_a_kind() is True:
-            hand_type = "four of a kind"
-        elif self.is_three_of_a_kind() is True:
-            hand_type = "three of a kind"
-        elif self.is_pair() is True:
-            hand_type = "pair"
-        else:
-            hand_type = "high card"
-        return hand_type
+            return None
+        return HAND_TYPES[rank_hand_type(self.get_rank())]
+
+    def get_rank(self):
+        """
+        Return the rank of the hand as int, None if there are less than five cards in hand.
+
+        The rank encodes the hand type and the values that break ties between hands of the same type,
+        so of two hands the one with the higher rank wins. sorted(hands, key=Hand.get_rank) orders hands.
+        """
+        if len(self.hand) < 5:
+            return None
+        if self._rank is None:
+            self._rank = rank_five(*[card.code for card in self.hand])
+        return self._rank
 
     def __repr__(self):
         """
@@ -0,0 +1,77 @@
+"""Score every 5-card poker hand and check the counts."""
+import sys
+import time
+from itertools import combinations, islice
+
+from poker import DECK, Hand, HAND_TYPES
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Combinatorial totals of the 2598960 hands under the rules of poker.Hand:
+# A 2 3 4 5 is not a straight (4 such straight flushes count as flush, 1020 straights as high card)
+# and two pair (123552 hands) counts as pair.
+EXPECTED_COUNTS = {
+    "high card": 1303560,
+    "pair": 1221792,
+    "three of a kind": 54912,
+    "straight": 9180,
+    "flush": 5112,
+    "full house": 3744,
+    "four of a kind": 624,
+    "straight flush": 36,
+}
+
+
+def peak_memory_kb():
+    """Return peak resident memory of the process in kB or None if it cannot be measured."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def benchmark(limit: int = None) -> dict:
+    """
+    Score all 5-card hands (or the first limit of them) through Hand.get_hand_type.
+
+    Return a dict with the number of hands, seconds, hands per second, peak memory and counts per hand type.
+    """
+    counts = dict.fromkeys(HAND_TYPES, 0)
+    hands = 0
+    start = time.perf_counter()
+    for cards in islice(combinations(DECK, 5), limit):
+        hand = Hand()
+        for card in cards:
+            hand.add_card(card)
+        counts[hand.get_hand_type()] += 1
+        hands += 1
+    seconds = time.perf_counter() - start
+    return {
+        "hands": hands,
+        "seconds": seconds,
+        "hands_per_second": hands / seconds if seconds else 0,
+        "peak_memory_kb": peak_memory_kb(),
+        "counts": counts,
+    }
+
+
+def main(args) -> int:
+    """Run the benchmark and print the report. Return 1 if the counts of a full run are wrong."""
+    limit = int(args[0]) if args else None
+    report = benchmark(limit)
+    print(f"{report['hands']} hands in {report['seconds']:.2f} s, {report['hands_per_second']:.0f} hands/s")
+    print(f"peak memory: {report['peak_memory_kb']} kB")
+    wrong = False
+    for hand_type, count in report["counts"].items():
+        expected = EXPECTED_COUNTS[hand_type]
+        mark = "" if limit is not None or count == expected else f" (expected {expected})"
+        wrong = wrong or bool(mark)
+        print(f"{hand_type}: {count}{mark}")
+    return 1 if wrong else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,57 @@
+"""Monte Carlo equity for poker hands."""
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from poker import DECK, Hand, HAND_TYPES, evaluate_five, get_card
+
+DECK_CODES = tuple(card.code for card in DECK)
+
+
+def run_trials(held: tuple, trials: int, seed: int) -> list:
+    """
+    Complete the held cards randomly trials times and count the hand types.
+
+    Return a list of counts indexed by hand type code.
+    """
+    rng = random.Random(seed)
+    deck = [code for code in DECK_CODES if code not in held]
+    missing = 5 - len(held)
+    counts = [0] * len(HAND_TYPES)
+    for _ in range(trials):
+        counts[evaluate_five(*held, *rng.sample(deck, missing))] += 1
+    return counts
+
+
+def estimate_hand_types(hand: Hand, trials: int, seed: int = 0, workers: int = None, chunk_size: int = 10000) -> dict:
+    """
+    Estimate the probability of finishing the hand in each hand type.
+
+    Trials are split into chunks of chunk_size, every chunk gets its own seed derived from seed,
+    so the result does not depend on the number of workers. Chunks are run in a process pool
+    and the counts are merged at the end.
+
+    Return a dict {hand type: probability}.
+    """
+    held = tuple(card.code for card in hand.get_cards())
+    seeder = random.Random(seed)
+    chunks = []
+    for start in range(0, trials, chunk_size):
+        chunks.append((held, min(chunk_size, trials - start), seeder.getrandbits(64)))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) == 1:
+        partials = [run_trials(*chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            partials = list(executor.map(run_trials, *zip(*chunks)))
+    counts = [sum(column) for column in zip(*partials)]
+    return {hand_type: count / trials for hand_type, count in zip(HAND_TYPES, counts)}
+
+
+if __name__ == "__main__":
+    hand = Hand()
+    hand.add_card(get_card("A", "hearts"))
+    hand.add_card(get_card("A", "clubs"))
+    hand.add_card(get_card("9", "spades"))
+    for hand_type, probability in estimate_hand_types(hand, 200000).items():
+        print(f"{hand_type}: {probability:.4f}")
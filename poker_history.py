@@ -0,0 +1,79 @@
+"""Classify hands from a hand history file."""
+import sys
+from itertools import islice
+
+from poker import HAND_TYPES, SUITS, VALUES, evaluate_five, evaluate_hands, get_card, np
+
+
+def read_hands(lines):
+    """
+    Parse hands from lines of text, one hand per line.
+
+    A hand is five cards in the form Card.__repr__ gives, separated by commas:
+    "2 of hearts, 4 of spades, 5 of clubs, 3 of diamonds, 6 of hearts"
+    Surrounding square brackets are allowed and empty lines are skipped.
+    Yield a tuple of shared cards (see poker.get_card) for every hand.
+    """
+    for line_number, line in enumerate(lines, 1):
+        line = line.strip().strip("[]")
+        if not line:
+            continue
+        cards = []
+        for text in line.split(","):
+            value, _, suit = text.strip().partition(" of ")
+            if value not in VALUES or suit not in SUITS:
+                raise ValueError(f"Line {line_number}: invalid card {text.strip()!r}")
+            cards.append(get_card(value, suit))
+        if len(cards) != 5 or len(set(cards)) != 5:
+            raise ValueError(f"Line {line_number}: a hand needs five different cards")
+        yield tuple(cards)
+
+
+def chunks(iterable, size: int):
+    """Yield lists of at most size items from iterable."""
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def classify_chunk(hands: list) -> list:
+    """Return the hand type codes of a list of hands, in one numpy call if numpy is available."""
+    codes = [[card.code for card in cards] for cards in hands]
+    if np is not None:
+        return evaluate_hands(codes).tolist()
+    return [evaluate_five(*row) for row in codes]
+
+
+def classify_file(filename: str, output=None, chunk_size: int = 10000) -> dict:
+    """
+    Classify every hand in a hand history file.
+
+    The file is read line by line and classified in chunks of chunk_size hands, so memory use does not
+    depend on the file size. If output (a writable text file) is given, the hand type of every hand is
+    written to it, one per line.
+    Return a dict {hand type: count}.
+    """
+    counts = [0] * len(HAND_TYPES)
+    with open(filename) as file:
+        for chunk in chunks(read_hands(file), chunk_size):
+            types = classify_chunk(chunk)
+            for code in types:
+                counts[code] += 1
+            if output is not None:
+                output.writelines(HAND_TYPES[code] + "\n" for code in types)
+    return dict(zip(HAND_TYPES, counts))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python poker_history.py HISTORY_FILE [OUTPUT_FILE]")
+        sys.exit(1)
+    if len(sys.argv) > 2:
+        with open(sys.argv[2], "w") as output_file:
+            totals = classify_file(sys.argv[1], output_file)
+    else:
+        totals = classify_file(sys.argv[1])
+    for hand_type, count in totals.items():
+        print(f"{hand_type}: {count}")